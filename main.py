@@ -1,19 +1,30 @@
 import ctypes
+import hashlib
 import json
+import marshal
 import os
 import queue
 import sys
 import threading
 import time
+import weakref
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from ctypes import wintypes
 from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
-from typing import Callable
-from reportlab.graphics import renderPM
-from svglib.svglib import svg2rlg
+from typing import Callable, Generic, Sequence, TypeVar
 from tomllib import load as toml_load
 
 import tkinter as tk
+from tkinter import font as tkfont
 from tkinter import messagebox, simpledialog, ttk
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 # Icons and stratagem info.
 # https://github.com/nvigneux/Helldivers-2-Stratagems-icons-svg
 # https://helldivers.wiki.gg/wiki/Category:Stratagems
@@ -24,7 +35,12 @@ USER_DATA_DIR = Path(os.getenv("APPDATA", str(BASE_DIR))) / "pystrat"
 USER_DATA_DIR.mkdir(parents=True, exist_ok=True)
 DATA_FILE = USER_DATA_DIR / "user_data.json"
 STRATAGEMS_FILE = RESOURCE_DIR / "stratagems.json"
+STRATAGEMS_CACHE = USER_DATA_DIR / "stratagems.cache"
+# Bump whenever the Stratagem fields change, so old caches are ignored.
+STRATAGEMS_CACHE_VERSION = 3
 ICON_DIR = RESOURCE_DIR / "StratagemIcons"
+ICON_CACHE_DIR = USER_DATA_DIR / "icon_cache"
+ICON_CACHE_DIR.mkdir(parents=True, exist_ok=True)
 PYPROJECT = RESOURCE_DIR / "pyproject.toml"
 
 DARK_BG = "#131316"
@@ -34,12 +50,41 @@ MUTED_FG = "#a2a2ad"
 SCROLLBAR_BG = "#2a2a33"
 SCROLLBAR_ACTIVE_BG = "#343441"
 
+ICON_SIZE = 64
+ICON_CACHE_MAX = 64
+PNG_CACHE_MAX = 256
+ICON_BATCH_SIZE = 8
+SAVE_DEBOUNCE_MS = 500
+SEARCH_DEBOUNCE_MS = 80
+UI_POLL_FALLBACK_MS = 500
+
 KEY_VK = {
     "W": 0x57,
     "A": 0x41,
     "S": 0x53,
     "D": 0x44,
 }
+ARROWS = {"W": "⬆", "A": "⬅", "S": "⬇", "D": "➡"}
+
+KEYEVENTF_KEYUP = 0x0002
+KEYEVENTF_SCANCODE = 0x0008
+KEY_HOLD_NS = 20_000_000
+SPIN_WAIT_NS = 1_000_000
+VK_CONTROL = 0x11
+ARROW_VK = {"W": 0x26, "A": 0x25, "S": 0x28, "D": 0x27}
+
+
+INPUT_VK = {"wasd": KEY_VK, "arrows": ARROW_VK}
+
+
+def sequence_vks(sequence: Sequence[str], vk_map: dict[str, int]) -> tuple[int, ...]:
+    resolved = []
+    for step in sequence:
+        vk = vk_map.get(step.upper())
+        if vk:
+            resolved.append(vk)
+    return tuple(resolved)
+
 
 class _KEYBDINPUT(ctypes.Structure):
     _fields_ = [
@@ -82,11 +127,66 @@ class _INPUT(ctypes.Structure):
     _fields_ = [("type", ctypes.c_ulong), ("union", _INPUTUNION)]
 
 
+_LP_INPUT = ctypes.POINTER(_INPUT)
+
+
+class _MSG(ctypes.Structure):
+    _fields_ = [
+        ("hwnd", wintypes.HWND),
+        ("message", wintypes.UINT),
+        ("wParam", wintypes.WPARAM),
+        ("lParam", wintypes.LPARAM),
+        ("time", wintypes.DWORD),
+        ("pt", wintypes.POINT),
+    ]
+
+
 WM_HOTKEY = 0x0312
-WM_QUIT = 0x0012
 MOD_NOREPEAT = 0x4000
+PM_REMOVE = 0x0001
+QS_HOTKEY = 0x0080
+MWMO_INPUTAVAILABLE = 0x0004
+WAIT_OBJECT_0 = 0x00000000
+INFINITE = 0xFFFFFFFF
+CREATE_WAITABLE_TIMER_MANUAL_RESET = 0x00000001
+CREATE_WAITABLE_TIMER_HIGH_RESOLUTION = 0x00000002
+TIMER_ALL_ACCESS = 0x1F0003
+THREAD_PRIORITY_TIME_CRITICAL = 15
 DEBUG_KEY_CAPTURE = False
 
+IS_WIN = os.name == "nt"
+
+if IS_WIN:
+    _user32 = ctypes.WinDLL("user32", use_last_error=True)
+    _user32.SendInput.argtypes = [wintypes.UINT, _LP_INPUT, ctypes.c_int]
+    _user32.SendInput.restype = wintypes.UINT
+    _kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)
+    _kernel32.CreateWaitableTimerExW.restype = wintypes.HANDLE
+    _kernel32.SetWaitableTimer.argtypes = [
+        wintypes.HANDLE,
+        ctypes.POINTER(ctypes.c_longlong),
+        wintypes.LONG,
+        ctypes.c_void_p,
+        ctypes.c_void_p,
+        wintypes.BOOL,
+    ]
+    _kernel32.WaitForSingleObject.argtypes = [wintypes.HANDLE, wintypes.DWORD]
+    _kernel32.CloseHandle.argtypes = [wintypes.HANDLE]
+    _kernel32.CreateEventW.restype = wintypes.HANDLE
+    _kernel32.SetEvent.argtypes = [wintypes.HANDLE]
+    _kernel32.GetCurrentThread.restype = wintypes.HANDLE
+    _kernel32.GetThreadPriority.argtypes = [wintypes.HANDLE]
+    _kernel32.SetThreadPriority.argtypes = [wintypes.HANDLE, ctypes.c_int]
+    _user32.MsgWaitForMultipleObjectsEx.argtypes = [
+        wintypes.DWORD,
+        ctypes.POINTER(wintypes.HANDLE),
+        wintypes.DWORD,
+        wintypes.DWORD,
+        wintypes.DWORD,
+    ]
+    _user32.MsgWaitForMultipleObjectsEx.restype = wintypes.DWORD
+    _CTRL_SCAN = _user32.MapVirtualKeyW(VK_CONTROL, 0)
+
 LOCAL_KEYSYM_TO_INDEX = {
     "KP_7": 0,
     "KP_8": 1,
@@ -100,13 +200,50 @@ LOCAL_KEYSYM_TO_INDEX = {
 }
 
 
-@dataclass
+@dataclass(slots=True)
 class Stratagem:
     name: str
     sequence: list[str]
     category: str
-    icon: tk.PhotoImage
     sequence_display: str
+    joined_sequence: str
+    vks: dict[str, tuple[int, ...]]
+
+
+K = TypeVar("K")
+V = TypeVar("V")
+
+
+class LRUCache(Generic[K, V]):
+    def __init__(self, max_entries: int) -> None:
+        self.max_entries = max_entries
+        self.entries: OrderedDict[K, V] = OrderedDict()
+
+    def get(self, key: K) -> V | None:
+        value = self.entries.get(key)
+        if value is not None:
+            self.entries.move_to_end(key)
+        return value
+
+    def put(self, key: K, value: V) -> None:
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def __contains__(self, key: object) -> bool:
+        # Does not touch LRU order.
+        return key in self.entries
+
+
+def _atomic_write_bytes(path: Path, data: bytes) -> None:
+    tmp = path.with_name(f"{path.name}.{threading.get_ident()}.tmp")
+    try:
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+    except OSError:
+        tmp.unlink(missing_ok=True)
+        raise
 
 
 @dataclass
@@ -117,6 +254,7 @@ class UserData:
     presets: dict[str, list[str]]
     active_preset: str
     input_keys: str
+    batch_input: bool = False
 
     @classmethod
     def load(cls, path: Path) -> "UserData":
@@ -129,7 +267,8 @@ class UserData:
                 active_preset="",
                 input_keys="wasd",
             )
-        raw = json.loads(path.read_text(encoding="utf-8"))
+        data = path.read_bytes()
+        raw = orjson.loads(data) if orjson else json.loads(data)
         input_keys = raw.get("input_keys", "wasd")
         if input_keys not in ("wasd", "arrows"):
             input_keys = "wasd"
@@ -140,6 +279,7 @@ class UserData:
             presets=raw.get("presets", {}),
             active_preset=raw.get("active_preset", ""),
             input_keys=input_keys,
+            batch_input=bool(raw.get("batch_input", False)),
         )
 
     def to_payload(self) -> dict[str, object]:
@@ -150,30 +290,191 @@ class UserData:
             "presets": self.presets,
             "active_preset": self.active_preset,
             "input_keys": self.input_keys,
+            "batch_input": self.batch_input,
         }
 
     def save(self, path: Path) -> None:
-        path.write_text(json.dumps(self.to_payload(), indent=4), encoding="utf-8")
+        payload = self.to_payload()
+        if orjson:
+            data = orjson.dumps(payload)
+        else:
+            data = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+        _atomic_write_bytes(path, data)
 
 
 def load_stratagems() -> list[Stratagem]:
-    with STRATAGEMS_FILE.open("r", encoding="utf-8") as handle:
-        raw = json.load(handle)
-    arrows = {"W": "⬆", "A": "⬅", "S": "⬇", "D": "➡"}
-    items: List[Stratagem] = []
+    # Keyed on a content hash: the onefile build re-extracts the file each launch.
+    data = STRATAGEMS_FILE.read_bytes()
+    key = (STRATAGEMS_CACHE_VERSION, hashlib.blake2b(data, digest_size=8).digest())
+    try:
+        cached_key, rows = marshal.loads(STRATAGEMS_CACHE.read_bytes())
+        if cached_key == key:
+            return [Stratagem(sys.intern(name), *rest) for name, *rest in rows]
+    except (OSError, EOFError, ValueError, TypeError):
+        pass
+
+    raw = orjson.loads(data) if orjson else json.loads(data)
+    items: list[Stratagem] = []
     for entry in raw:
         category = entry.get("category", "general")
-        svg_path = ICON_DIR / f"{entry['name']}.svg"
-        png = render_svg_to_png_bytes(svg_path, 64)
-        image = tk.PhotoImage(data=png)
-        seq_display = " ".join(arrows.get(step.upper(), step) for step in entry["sequence"])
+        sequence = entry["sequence"]
+        seq_display = " ".join(ARROWS.get(step.upper(), step) for step in sequence)
         items.append(
-            Stratagem(entry["name"], entry["sequence"], category, image, seq_display)
+            Stratagem(
+                sys.intern(entry["name"]),
+                sequence,
+                category,
+                seq_display,
+                " ".join(sequence),
+                {
+                    mode: sequence_vks(sequence, vk_map)
+                    for mode, vk_map in INPUT_VK.items()
+                },
+            )
         )
+    save_stratagems_cache(key, items)
     return items
 
 
-def render_svg_to_png_bytes(svg_path: Path, size: int) -> str | None:
+def save_stratagems_cache(key: tuple[int, bytes], items: list[Stratagem]) -> None:
+    rows = [
+        (s.name, s.sequence, s.category, s.sequence_display, s.joined_sequence, s.vks)
+        for s in items
+    ]
+    try:
+        _atomic_write_bytes(STRATAGEMS_CACHE, marshal.dumps((key, rows)))
+    except OSError:
+        pass
+
+
+_svg_fingerprints: dict[Path, str | None] = {}
+
+# Imported by _ensure_svg on first render; svglib and reportlab load slowly.
+svg2rlg = None
+renderPM = None
+_svg_import_lock = threading.Lock()
+
+
+def _ensure_svg() -> None:
+    global svg2rlg, renderPM
+    if renderPM is not None:
+        return
+    with _svg_import_lock:
+        if renderPM is not None:
+            return
+        from reportlab.graphics import renderPM as render_pm
+        from svglib.svglib import svg2rlg as svg_to_rlg
+
+        svg2rlg = svg_to_rlg
+        renderPM = render_pm
+
+
+_SAFE_NAME_TABLE = str.maketrans(
+    {ch: "_" for ch in map(chr, range(128)) if not ch.isalnum()}
+)
+
+
+@lru_cache(maxsize=512)
+def cache_stem(name: str, size: int) -> str:
+    if name.isascii():
+        safe = name.translate(_SAFE_NAME_TABLE)
+    else:
+        safe = "".join(ch if ch.isalnum() else "_" for ch in name)
+    return f"{safe}_{size}"
+
+
+def safe_cache_name(name: str, size: int, fingerprint: str) -> str:
+    return f"{cache_stem(name, size)}_{fingerprint}.png"
+
+
+def svg_fingerprint(svg_path: Path) -> str | None:
+    if svg_path in _svg_fingerprints:
+        return _svg_fingerprints[svg_path]
+    # Not mtime: the onefile build re-extracts every SVG on each launch.
+    try:
+        data = svg_path.read_bytes()
+    except OSError:
+        fingerprint = None
+    else:
+        fingerprint = hashlib.blake2b(data, digest_size=8).hexdigest()
+    _svg_fingerprints[svg_path] = fingerprint
+    return fingerprint
+
+
+IconKey = tuple[str, int, str]
+
+
+def icon_key(name: str, size: int) -> IconKey:
+    return (name, size, svg_fingerprint(ICON_DIR / f"{name}.svg") or "")
+
+
+# Shared by every app instance; only touched from the Tk thread.
+icon_png_cache: LRUCache[IconKey, bytes] = LRUCache(PNG_CACHE_MAX)
+
+
+def icon_cache_path(name: str, size: int) -> Path | None:
+    fingerprint = svg_fingerprint(ICON_DIR / f"{name}.svg")
+    if fingerprint is None:
+        return None
+    return ICON_CACHE_DIR / safe_cache_name(name, size, fingerprint)
+
+
+def cached_icon_png(name: str, size: int) -> bytes | None:
+    # Disk cache only; never renders.
+    cache_path = icon_cache_path(name, size)
+    if cache_path is None:
+        return None
+    try:
+        return cache_path.read_bytes()
+    except OSError:
+        return None
+
+
+def load_icon_png(name: str, size: int) -> bytes | None:
+    png = cached_icon_png(name, size)
+    if png is not None:
+        return png
+    cache_path = icon_cache_path(name, size)
+    if cache_path is None:
+        return None
+    png = render_svg_to_png(ICON_DIR / f"{name}.svg", size, cache_path)
+    if png is not None:
+        prune_icon_cache(name, size, cache_path)
+    return png
+
+
+def prune_icon_cache(name: str, size: int, keep: Path) -> None:
+    # Drop renders of the same icon made from an older copy of its SVG.
+    parts = keep.name.count("_")
+    for stale in keep.parent.glob(f"{cache_stem(name, size)}_*.png"):
+        if stale != keep and stale.name.count("_") == parts:
+            # A locked file is left for a later prune.
+            try:
+                stale.unlink(missing_ok=True)
+            except OSError:
+                pass
+
+
+def load_icon_pngs(
+    names: Sequence[str],
+    size: int,
+    on_error: Callable[[str, Exception], None] | None = None,
+) -> list[bytes | None]:
+    pngs: list[bytes | None] = []
+    for name in names:
+        try:
+            pngs.append(load_icon_png(name, size))
+        except Exception as exc:
+            pngs.append(None)
+            if on_error is not None:
+                on_error(name, exc)
+    return pngs
+
+
+def render_svg_to_png(svg_path: Path, size: int, cache_path: Path) -> bytes | None:
+    if not svg_path.exists():
+        return None
+    _ensure_svg()
     drawing = svg2rlg(str(svg_path))
     if drawing is None:
         return None
@@ -183,42 +484,32 @@ def render_svg_to_png_bytes(svg_path: Path, size: int) -> str | None:
     drawing.scale(scale, scale)
     drawing.width = width * scale
     drawing.height = height * scale
-    return renderPM.drawToString(drawing, fmt="PNG", bg=0x0F0F12)
+    png = renderPM.drawToString(drawing, fmt="PNG", bg=0x0F0F12)
+    try:
+        _atomic_write_bytes(cache_path, png)
+    except OSError:
+        pass
+    return png
 
 
-def parse_key_code(code: str) -> int:
+@lru_cache(maxsize=None)
+def parse_key_code(code: str | int) -> int:
+    if isinstance(code, int):
+        return code
     return int(code, 16)
 
 
 class HotkeyManager:
     def __init__(self, notify: Callable[[int], None]) -> None:
-        if os.name != "nt":
+        if not IS_WIN:
             raise RuntimeError("Hotkeys require Windows.")
-        import ctypes
-        from ctypes import wintypes
-
-        self.ctypes = ctypes
-        self.wintypes = wintypes
-        self.user32 = ctypes.windll.user32
+        self.quit_event = _kernel32.CreateEventW(None, True, False, None)
         self.notify = notify
         self.thread: threading.Thread | None = None
-        self.thread_id: int | None = None
         self.ready = threading.Event()
         self.errors: list[str] = []
         self.hotkey_map: dict[int, int] = {}
 
-        class MSG(ctypes.Structure):
-            _fields_ = [
-                ("hwnd", wintypes.HWND),
-                ("message", wintypes.UINT),
-                ("wParam", wintypes.WPARAM),
-                ("lParam", wintypes.LPARAM),
-                ("time", wintypes.DWORD),
-                ("pt", wintypes.POINT),
-            ]
-
-        self.MSG = MSG
-
     def start(self, hotkey_map: dict[int, int]) -> None:
         self.hotkey_map = dict(hotkey_map)
         self.thread = threading.Thread(target=self._message_loop, daemon=True)
@@ -226,29 +517,37 @@ class HotkeyManager:
         self.ready.wait(timeout=2)
 
     def stop(self) -> None:
-        if self.thread_id is not None:
-            post_thread_message = getattr(self.user32, "PostThreadMessageW")
-            post_thread_message(self.thread_id, WM_QUIT, 0, 0)
+        _kernel32.SetEvent(self.quit_event)
         if self.thread:
             self.thread.join(timeout=1)
+        if not (self.thread and self.thread.is_alive()):
+            _kernel32.CloseHandle(self.quit_event)
 
     def _message_loop(self) -> None:
-        msg = self.MSG()
-        self.thread_id = self.ctypes.windll.kernel32.GetCurrentThreadId()
-        self.user32.PeekMessageW(self.ctypes.byref(msg), None, 0, 0, 0)
-
+        msg = _MSG()
+        msg_ref = ctypes.byref(msg)
         for hotkey_id, vk in self.hotkey_map.items():
-            if not self.user32.RegisterHotKey(None, hotkey_id, MOD_NOREPEAT, vk):
+            if not _user32.RegisterHotKey(None, hotkey_id, MOD_NOREPEAT, vk):
                 self.errors.append(f"Failed to register hotkey {hotkey_id}")
 
         self.ready.set()
 
-        while self.user32.GetMessageW(self.ctypes.byref(msg), None, 0, 0) != 0:
-            if msg.message == WM_HOTKEY:
-                self.notify(int(msg.wParam))
+        handles = (wintypes.HANDLE * 1)(self.quit_event)
+        while True:
+            result = _user32.MsgWaitForMultipleObjectsEx(
+                1, handles, INFINITE, QS_HOTKEY, MWMO_INPUTAVAILABLE
+            )
+            if result != WAIT_OBJECT_0 + 1:
+                break
+            fired: dict[int, None] = {}
+            while _user32.PeekMessageW(msg_ref, None, 0, 0, PM_REMOVE):
+                if msg.message == WM_HOTKEY:
+                    fired[int(msg.wParam)] = None
+            for hotkey_id in fired:
+                self.notify(hotkey_id)
 
         for hotkey_id in list(self.hotkey_map.keys()):
-            self.user32.UnregisterHotKey(None, hotkey_id)
+            _user32.UnregisterHotKey(None, hotkey_id)
 
 
 class StratagemApp:
@@ -264,13 +563,26 @@ class StratagemApp:
 
         self.stratagems = load_stratagems()
         self.stratagem_map = {item.name: item for item in self.stratagems}
-        self.stratagem_category = {item.name: item.category for item in self.stratagems}
         self.stratagem_names = [item.name for item in self.stratagems]
+        self._by_category: dict[str, list[tuple[str, str]]] = {}
+        for item in self.stratagems:
+            self._by_category.setdefault(item.category, []).append(
+                (item.name, item.name.lower())
+            )
+        self.icon_cache: LRUCache[IconKey, tk.PhotoImage] = LRUCache(ICON_CACHE_MAX)
+        self._live_icons: weakref.WeakValueDictionary[IconKey, tk.PhotoImage] = (
+            weakref.WeakValueDictionary()
+        )
+        self.blank_icon = tk.PhotoImage(width=ICON_SIZE, height=ICON_SIZE)
+        self.render_pool = ThreadPoolExecutor(max_workers=min(4, os.cpu_count() or 2))
+        self.icon_jobs: dict[IconKey, list[Callable[[tk.PhotoImage | None], None]]] = {}
+        self._icon_error_reported = False
 
         self.user_data = UserData.load(DATA_FILE)
         self.keybinds = self.user_data.keybinds
         self.equipped = self.user_data.equipped_stratagems
         self.key_delay_ms = self.user_data.key_delay_ms
+        self.batch_input = self.user_data.batch_input
         self.presets = self.user_data.presets
         self.active_preset = self.user_data.active_preset
         self.input_keys = self.user_data.input_keys
@@ -287,32 +599,35 @@ class StratagemApp:
             {"key_code": "0x63", "letter": "NumPad3"},
         ]
 
-        if not self.keybinds:
-            self.keybinds = list(desired_keybinds)
-        else:
-            existing = {entry.get("letter") for entry in self.keybinds}
-            missing = [
-                entry for entry in desired_keybinds if entry["letter"] not in existing
-            ]
-            if missing:
-                self.keybinds.extend(missing)
-            order_map = {
-                entry["letter"]: idx for idx, entry in enumerate(desired_keybinds)
-            }
-            self.keybinds.sort(
-                key=lambda entry: order_map.get(entry.get("letter"), 999)
-            )
+        by_letter = {entry.get("letter"): entry for entry in self.keybinds}
+        self.keybinds = [
+            by_letter.get(entry["letter"], entry) for entry in desired_keybinds
+        ]
 
-        for name in self.equipped:
-            if name and name not in self.stratagem_names:
-                self.stratagem_names.append(name)
+        self._hotkey_table = [
+            (1000 + idx, parse_key_code(keybind["key_code"]), idx)
+            for idx, keybind in enumerate(self.keybinds)
+        ]
+
+        names_set = set(self.stratagem_names)
+        self.stratagem_names.extend(
+            name
+            for name in dict.fromkeys(self.equipped)
+            if name and name not in names_set
+        )
 
-        if len(self.equipped) < len(self.keybinds):
-            default_fill = self.stratagem_names[
-                : len(self.keybinds) - len(self.equipped)
-            ]
-            self.equipped.extend(default_fill)
-        self.equipped = self.equipped[: len(self.keybinds)]
+        slots = len(self.keybinds)
+        default_fill = self.stratagem_names[: max(slots - len(self.equipped), 0)]
+        self.equipped = [
+            sys.intern(name) if isinstance(name, str) else name
+            for name in self.equipped[:slots]
+        ]
+        self.equipped += default_fill
+        self._equipped_index: dict[str, list[int]] = {}
+        for index, name in enumerate(self.equipped):
+            self._equipped_index.setdefault(name, []).append(index)
+        self._save_pending = False
+        self._save_after_id: str | None = None
         self.persist_user_data()
 
         self.sequence_labels: list[tk.Label] = []
@@ -322,18 +637,46 @@ class StratagemApp:
         self.status_var = tk.StringVar(value="Ready")
 
         self.hotkeys: HotkeyManager | None = None
-        self.hotkey_id_to_index: dict[int, int] = {}
-        self.ui_queue: queue.Queue[Callable[[], None]] = queue.Queue()
+        self.hotkey_id_to_index = {
+            hotkey_id: idx for hotkey_id, _vk, idx in self._hotkey_table
+        }
+        self.ui_queue: deque[Callable[[], None]] = deque()
+        self._pending_ui: dict[str, Callable[[], None]] = {}
+        self._drain_armed = False
+        self._tcl_threaded = bool(
+            self.root.tk.call("info", "exists", "tcl_platform(threaded)")
+        )
+        self.root.bind("<<UIQueue>>", lambda _e: self.process_ui_queue())
+        self._alive = True
+        self._send_queue: queue.SimpleQueue[
+            tuple[Callable[[Sequence[int]], None], tuple[int, ...]]
+        ] = queue.SimpleQueue()
+        self._send_timer: int | None = None
+        threading.Thread(target=self._send_worker, daemon=True).start()
+        self._fonts: dict[tuple[str, int, str], tkfont.Font] = {}
         self.last_picker_scroll: float | None = None
         self.suppress_picker_scroll_capture = False
         self.pending_picker_restore = False
         self.build_ui()
+        self.warm_icon_cache()
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
         self.register_hotkeys()
         self.register_local_bindings()
         if DEBUG_KEY_CAPTURE:
             self.register_debug_key_capture()
         self.root.after(100, self.root.focus_set)
-        self.root.after(30, self.process_ui_queue)
+        # Picks up anything queued before mainloop could receive the event.
+        self.root.after_idle(self.process_ui_queue)
+        if not self._tcl_threaded:
+            self.root.after(UI_POLL_FALLBACK_MS, self._poll_ui_queue)
+
+    def font(self, family: str, size: int, weight: str = "normal") -> tkfont.Font:
+        key = (family, size, weight)
+        font = self._fonts.get(key)
+        if font is None:
+            font = tkfont.Font(root=self.root, family=family, size=size, weight=weight)
+            self._fonts[key] = font
+        return font
 
     def build_ui(self) -> None:
         self.root.grid_rowconfigure(2, weight=1)
@@ -344,7 +687,7 @@ class StratagemApp:
             text="Stratagem Hotkeys",
             bg=DARK_BG,
             fg=TEXT_FG,
-            font=("Segoe UI", 18, "bold"),
+            font=self.font("Segoe UI", 18, "bold"),
         )
         header.grid(row=0, column=0, sticky="n", pady=(18, 6))
 
@@ -353,7 +696,7 @@ class StratagemApp:
             text="Press a numpad key to activate the assigned stratagem.",
             bg=DARK_BG,
             fg=MUTED_FG,
-            font=("Segoe UI", 10),
+            font=self.font("Segoe UI", 10),
         )
         subtitle.grid(row=1, column=0, sticky="n", pady=(0, 12))
 
@@ -364,7 +707,7 @@ class StratagemApp:
             text="Key Delay (ms):",
             bg=DARK_BG,
             fg=MUTED_FG,
-            font=("Segoe UI", 9),
+            font=self.font("Segoe UI", 9),
         )
         delay_label.pack(side="left", padx=(0, 6))
         self.key_delay_var = tk.IntVar(value=self.key_delay_ms)
@@ -388,7 +731,7 @@ class StratagemApp:
             text="Input Keys:",
             bg=DARK_BG,
             fg=MUTED_FG,
-            font=("Segoe UI", 9),
+            font=self.font("Segoe UI", 9),
         )
         key_mode_label.pack(side="left", padx=(0, 6))
         self.input_keys_var = tk.StringVar(
@@ -403,6 +746,20 @@ class StratagemApp:
         )
         key_mode_combo.pack(side="left")
         key_mode_combo.bind("<<ComboboxSelected>>", self.on_input_keys_change)
+        self.batch_input_var = tk.BooleanVar(value=self.batch_input)
+        batch_check = tk.Checkbutton(
+            key_mode_frame,
+            text="Batch send",
+            variable=self.batch_input_var,
+            command=self.on_batch_input_change,
+            bg=DARK_BG,
+            fg=MUTED_FG,
+            activebackground=DARK_BG,
+            activeforeground=TEXT_FG,
+            selectcolor=CARD_BG,
+            font=self.font("Segoe UI", 9),
+        )
+        batch_check.pack(side="left", padx=(10, 0))
 
         preset_frame = tk.Frame(self.root, bg=DARK_BG)
         preset_frame.grid(row=0, column=0, sticky="e", padx=20, pady=(18, 6))
@@ -411,7 +768,7 @@ class StratagemApp:
             text="Preset:",
             bg=DARK_BG,
             fg=MUTED_FG,
-            font=("Segoe UI", 9),
+            font=self.font("Segoe UI", 9),
         )
         preset_label.pack(side="left", padx=(0, 6))
         self.preset_var = tk.StringVar(value=self.active_preset)
@@ -436,7 +793,7 @@ class StratagemApp:
             activebackground=CARD_BG,
             activeforeground=TEXT_FG,
             relief="ridge",
-            font=("Segoe UI Black", 12, "bold"),
+            font=self.font("Segoe UI Black", 12, "bold"),
             width=2,
         )
         preset_menu = tk.Menu(preset_menu_button, tearoff=0)
@@ -467,43 +824,49 @@ class StratagemApp:
                 text=keybind["letter"],
                 bg=CARD_BG,
                 fg=TEXT_FG,
-                font=("Segoe UI", 11, "bold"),
+                font=self.font("Segoe UI", 11, "bold"),
             )
             key_label.grid(row=0, column=0, sticky="w")
 
             icon_label = tk.Label(
-                card, bg="#0f0f12", width=64, height=64, anchor="center"
+                card,
+                bg="#0f0f12",
+                width=64,
+                height=64,
+                anchor="center",
+                image=self.blank_icon,
             )
             icon_label.grid(row=1, column=0, rowspan=2, padx=(0, 12), pady=6)
-            icon_label.bind("<Button-1>", lambda _e, i=index: self.open_icon_picker(i))
+            icon_label.card_index = index
+            icon_label.bind("<Button-1>", self._on_card_click)
 
             name_label = tk.Label(
                 card,
                 text=self.equipped[index],
                 bg=CARD_BG,
                 fg=TEXT_FG,
-                font=("Segoe UI", 11, "bold"),
+                font=self.font("Segoe UI", 11, "bold"),
                 anchor="w",
                 cursor="hand2",
             )
             name_label.grid(row=1, column=1, sticky="ew")
-            name_label.bind("<Button-1>", lambda _e, i=index: self.open_icon_picker(i))
+            name_label.card_index = index
+            name_label.bind("<Button-1>", self._on_card_click)
 
             seq_label = tk.Label(
                 card,
                 text=self.sequence_for(self.equipped[index]),
                 bg=CARD_BG,
                 fg=MUTED_FG,
-                font=("Segoe UI Black", 14, "bold"),
+                font=self.font("Segoe UI Black", 14, "bold"),
             )
             seq_label.grid(row=2, column=1, sticky="w")
 
             self.sequence_labels.append(seq_label)
             self.icon_labels.append(icon_label)
             self.name_labels.append(name_label)
-            self.icon_labels[index].configure(
-                image=self.stratagem_map[self.equipped[index]].icon
-            )
+
+        self.load_card_icons(list(self._equipped_index))
 
         status_frame = tk.Frame(self.root, bg=CARD_BG, height=28)
         status_frame.grid(row=3, column=0, sticky="ew")
@@ -513,32 +876,187 @@ class StratagemApp:
             textvariable=self.status_var,
             bg=CARD_BG,
             fg=TEXT_FG,
-            font=("Segoe UI", 9),
+            font=self.font("Segoe UI", 9),
             anchor="w",
             padx=12,
         )
         status.pack(fill="both", expand=True)
 
+    def load_card_icons(self, names: Sequence[str]) -> None:
+        missing: list[tuple[str, Callable[[tk.PhotoImage | None], None]]] = []
+        for name in names:
+            photo = self.get_icon_photo(name)
+            self._apply_card_icons(name, photo)
+            if photo is None:
+                missing.append(
+                    (name, lambda photo, n=name: self._apply_card_icons(n, photo))
+                )
+        self.request_icons(missing, ICON_SIZE)
+
     def persist_user_data(self) -> None:
+        self._save_pending = True
+        if self._save_after_id is not None:
+            self.root.after_cancel(self._save_after_id)
+        self._save_after_id = self.root.after(SAVE_DEBOUNCE_MS, self._flush_user_data)
+
+    def _flush_user_data(self) -> None:
+        if self._save_after_id is not None:
+            self.root.after_cancel(self._save_after_id)
+            self._save_after_id = None
+        if not self._save_pending:
+            return
+        self._save_pending = False
         self.user_data.equipped_stratagems = list(self.equipped)
         self.user_data.keybinds = list(self.keybinds)
         self.user_data.key_delay_ms = self.key_delay_ms
         self.user_data.presets = dict(self.presets)
         self.user_data.active_preset = self.active_preset
         self.user_data.input_keys = self.input_keys
-        self.user_data.save(DATA_FILE)
+        self.user_data.batch_input = self.batch_input
+        try:
+            self.user_data.save(DATA_FILE)
+        except OSError:
+            self._save_pending = True
+            raise
+
+    def get_icon_photo(self, name: str, size: int = ICON_SIZE) -> tk.PhotoImage | None:
+        # Never renders; misses go through request_icons.
+        key = icon_key(name, size)
+        photo = self._cached_photo(key)
+        if photo is None:
+            png = cached_icon_png(name, size)
+            if png is None:
+                return None
+            photo = self._store_icon(key, png)
+        return photo
+
+    def _cached_photo(self, key: IconKey) -> tk.PhotoImage | None:
+        photo = self.icon_cache.get(key)
+        if photo is not None:
+            return photo
+        # An icon evicted from the LRU may still be live on a label.
+        photo = self._live_icons.get(key)
+        if photo is None:
+            png = icon_png_cache.get(key)
+            if png is None:
+                return None
+            photo = self._new_photo(key, png)
+        self.icon_cache.put(key, photo)
+        return photo
+
+    def _store_icon(self, key: IconKey, png: bytes) -> tk.PhotoImage:
+        icon_png_cache.put(key, png)
+        photo = self._live_icons.get(key) or self._new_photo(key, png)
+        self.icon_cache.put(key, photo)
+        return photo
+
+    def _new_photo(self, key: IconKey, png: bytes) -> tk.PhotoImage:
+        photo = tk.PhotoImage(data=png)
+        self._live_icons[key] = photo
+        return photo
+
+    def request_icons(
+        self,
+        requests: Sequence[tuple[str, Callable[[tk.PhotoImage | None], None]]],
+        size: int,
+    ) -> None:
+        missing: list[str] = []
+        for name, callback in requests:
+            key = icon_key(name, size)
+            photo = self._cached_photo(key)
+            if photo is not None:
+                callback(photo)
+                continue
+            waiters = self.icon_jobs.get(key)
+            if waiters is not None:
+                waiters.append(callback)
+                continue
+            self.icon_jobs[key] = [callback]
+            missing.append(name)
+        for start in range(0, len(missing), ICON_BATCH_SIZE):
+            names = missing[start : start + ICON_BATCH_SIZE]
+            future = self.render_pool.submit(
+                load_icon_pngs, names, size, self._report_icon_error
+            )
+            future.add_done_callback(
+                lambda f, names=names: self.run_in_ui(
+                    lambda: self._finish_icon_batch(names, size, f)
+                )
+            )
+
+    def warm_icon_cache(self, size: int = ICON_SIZE) -> None:
+        names = [
+            name
+            for name in self.stratagem_names
+            if (key := icon_key(name, size)) not in icon_png_cache
+            and key not in self.icon_jobs
+        ]
+        # No waiters yet; picker requests attach to these jobs.
+        for name in names:
+            self.icon_jobs[icon_key(name, size)] = []
+        for start in range(0, len(names), ICON_BATCH_SIZE):
+            batch = names[start : start + ICON_BATCH_SIZE]
+            future = self.render_pool.submit(
+                load_icon_pngs, batch, size, self._report_icon_error
+            )
+            future.add_done_callback(
+                lambda f, batch=batch: self.run_in_ui(
+                    lambda: self._finish_icon_batch(batch, size, f)
+                )
+            )
+
+    def _report_icon_error(self, name: str, exc: Exception) -> None:
+        # Called from the render pool.
+        if self._icon_error_reported:
+            return
+        self._icon_error_reported = True
+        self.set_status(f"Could not render icon for {name}: {exc}")
+
+    def _finish_icon_batch(self, names: list[str], size: int, future: Future) -> None:
+        pngs = future.result() if future.exception() is None else [None] * len(names)
+        for name, png in zip(names, pngs):
+            key = icon_key(name, size)
+            waiters = self.icon_jobs.pop(key, [])
+            if not waiters:
+                if png:
+                    icon_png_cache.put(key, png)
+                continue
+            photo = self._store_icon(key, png) if png else None
+            for callback in waiters:
+                callback(photo)
+
+    def _apply_icon(self, label: tk.Label, photo: tk.PhotoImage | None) -> None:
+        if not label.winfo_exists():
+            return
+        label.configure(image=photo or self.blank_icon)
+        # Keep a reference so cache eviction doesn't blank a visible label.
+        label.image = photo
+
+    def _apply_card_icons(self, name: str, photo: tk.PhotoImage | None) -> None:
+        # Slots reassigned while the icon was loading are no longer listed.
+        for index in self._equipped_index.get(name, ()):
+            self._apply_icon(self.icon_labels[index], photo)
+
+    def _on_card_click(self, event: tk.Event) -> None:
+        index = getattr(event.widget, "card_index", None)
+        if index is not None:
+            self.open_icon_picker(index)
 
     def sequence_for(self, name: str) -> str:
         strat = self.stratagem_map.get(name)
-        if not strat:
-            return "?"
-        return strat.sequence_display
+        return strat.sequence_display if strat else "?"
 
     def set_stratagem(self, index: int, name: str) -> None:
+        previous = self._equipped_index.get(self.equipped[index])
+        if previous is not None:
+            previous.remove(index)
+            if not previous:
+                del self._equipped_index[self.equipped[index]]
         self.equipped[index] = name
+        self._equipped_index.setdefault(name, []).append(index)
         self.sequence_labels[index].configure(text=self.sequence_for(name))
         self.name_labels[index].configure(text=name)
-        self.icon_labels[index].configure(image=self.stratagem_map[name].icon)
+        self.load_card_icons([name])
         self.persist_user_data()
 
     def open_icon_picker(self, index: int) -> None:
@@ -565,7 +1083,7 @@ class StratagemApp:
             text="Select Stratagem",
             bg=DARK_BG,
             fg=TEXT_FG,
-            font=("Segoe UI", 14, "bold"),
+            font=self.font("Segoe UI", 14, "bold"),
         )
         header.pack(pady=(16, 8))
 
@@ -576,7 +1094,7 @@ class StratagemApp:
             text="Search:",
             bg=DARK_BG,
             fg=MUTED_FG,
-            font=("Segoe UI", 9),
+            font=self.font("Segoe UI", 9),
         )
         search_label.pack(side="left", padx=(0, 6))
         search_var = tk.StringVar()
@@ -609,6 +1127,7 @@ class StratagemApp:
             yscrollcommand=lambda *args: (
                 scrollbar.set(*args),
                 self._remember_picker_scroll(canvas),
+                populate_visible(),
             )
         )
         canvas.pack(side="left", fill="both", expand=True)
@@ -639,87 +1158,167 @@ class StratagemApp:
         size = 52
         category_order = ["Offensive", "Supply", "Defensive", "General"]
 
-        # Build all widgets once; rebuild_grid only repositions/hides them.
         cat_header_widgets: dict[str, tk.Label] = {}
-        cell_widgets: dict[str, tk.Frame] = {}
         for category in category_order:
             cat_header_widgets[category] = tk.Label(
                 scroll_frame,
                 text=category,
                 bg=DARK_BG,
                 fg=MUTED_FG,
-                font=("Segoe UI", 10, "bold"),
+                font=self.font("Segoe UI", 10, "bold"),
                 anchor="w",
             )
-            for name in self.stratagem_names:
-                if self.stratagem_category.get(name) != category:
-                    continue
-                cell = tk.Frame(scroll_frame, bg=CARD_BG, padx=6, pady=6)
-                icon = tk.Label(cell, bg="#0f0f12", width=size, height=size)
-                icon.pack()
-                icon.configure(image=self.stratagem_map[name].icon)
-                label = tk.Label(
-                    cell,
-                    text=name,
-                    bg=CARD_BG,
-                    fg=TEXT_FG,
-                    font=("Segoe UI", 8),
-                    wraplength=110,
-                    justify="center",
-                )
-                label.pack(pady=(4, 0))
-                for widget in (cell, icon, label):
-                    widget.bind(
-                        "<Button-1>",
-                        lambda _e, n=name: self._select_stratagem_from_picker(
-                            picker, index, n
-                        ),
+
+        # Cells are created as their rows scroll into view, then kept.
+        cell_widgets: dict[str, tk.Frame] = {}
+
+        def on_cell_click(event: tk.Event) -> None:
+            name = getattr(event.widget, "stratagem_name", None)
+            if name is not None:
+                self._select_stratagem_from_picker(picker, index, name)
+
+        def make_cell(name: str) -> tuple[tk.Frame, tk.Label]:
+            cell = tk.Frame(scroll_frame, bg=CARD_BG, padx=6, pady=6)
+            icon = tk.Label(
+                cell, bg="#0f0f12", width=size, height=size, image=self.blank_icon
+            )
+            icon.pack()
+            label = tk.Label(
+                cell,
+                text=name,
+                bg=CARD_BG,
+                fg=TEXT_FG,
+                font=self.font("Segoe UI", 8),
+                wraplength=110,
+                justify="center",
+            )
+            label.pack(pady=(4, 0))
+            for widget in (cell, icon, label):
+                widget.stratagem_name = name
+                widget.bind("<Button-1>", on_cell_click)
+            cell_widgets[name] = cell
+            return cell, icon
+
+        last_filter_text: str | None = None
+        placed: dict[tk.Widget, tuple[int, int]] = {}
+        cell_rows: dict[int, list[str]] = {}
+        sized_rows = 0
+        row_height = 0
+
+        def place(widget: tk.Widget, row: int, column: int, **options: object) -> None:
+            if placed.get(widget) == (row, column):
+                return
+            widget.grid(row=row, column=column, **options)
+            placed[widget] = (row, column)
+
+        def place_cell(cell: tk.Frame, row: int, column: int) -> None:
+            place(cell, row, column, padx=6, pady=6, sticky="nsew")
+
+        def populate_visible() -> None:
+            if not cell_rows or not picker.winfo_exists():
+                return
+            viewport = canvas.winfo_height()
+            if viewport <= 1:
+                viewport = height
+            top = int(canvas.canvasy(0))
+            first = scroll_frame.grid_location(0, top)[1] - 3
+            last = scroll_frame.grid_location(0, top + viewport)[1] + 3
+            requests: list[tuple[str, Callable[[tk.PhotoImage | None], None]]] = []
+            for row in range(max(first, 0), last + 1):
+                for column, name in enumerate(cell_rows.get(row, ())):
+                    if name in cell_widgets:
+                        continue
+                    cell, icon = make_cell(name)
+                    place_cell(cell, row, column)
+                    requests.append(
+                        (name, lambda photo, w=icon: self._apply_icon(w, photo))
                     )
-                cell_widgets[name] = cell
+            if requests:
+                self.request_icons(requests, ICON_SIZE)
 
         def rebuild_grid(*_args: object) -> None:
+            nonlocal last_filter_text, sized_rows, row_height
             filter_text = search_var.get().strip().lower()
+            if filter_text == last_filter_text:
+                return
+            last_filter_text = filter_text
 
-            for header in cat_header_widgets.values():
-                header.grid_remove()
-            for cell in cell_widgets.values():
-                cell.grid_remove()
-
+            visible: set[tk.Widget] = set()
+            cell_rows.clear()
             row_cursor = 0
             for category in category_order:
                 cat_names = [
                     name
-                    for name in self.stratagem_names
-                    if self.stratagem_category.get(name) == category
-                    and (not filter_text or filter_text in name.lower())
+                    for name, lower in self._by_category.get(category, [])
+                    if not filter_text or filter_text in lower
                 ]
                 if not cat_names:
                     continue
 
-                cat_header_widgets[category].grid(
-                    row=row_cursor,
-                    column=0,
+                header = cat_header_widgets[category]
+                place(
+                    header,
+                    row_cursor,
+                    0,
                     columnspan=columns,
                     sticky="w",
                     padx=6,
                     pady=(10, 4),
                 )
+                visible.add(header)
                 row_cursor += 1
 
                 for idx, name in enumerate(cat_names):
-                    cell_widgets[name].grid(
-                        row=row_cursor + idx // columns,
-                        column=idx % columns,
-                        padx=6,
-                        pady=6,
-                        sticky="nsew",
-                    )
+                    row = row_cursor + idx // columns
+                    cell_rows.setdefault(row, []).append(name)
+                    cell = cell_widgets.get(name)
+                    if cell is not None:
+                        place_cell(cell, row, idx % columns)
+                        visible.add(cell)
 
                 row_cursor += (len(cat_names) + columns - 1) // columns
 
+            for widget in [w for w in placed if w not in visible]:
+                widget.grid_remove()
+                del placed[widget]
+
+            if not row_height and cell_rows:
+                # Measure one real cell to size the rows not yet populated.
+                first_row = min(cell_rows)
+                name = cell_rows[first_row][0]
+                if name not in cell_widgets:
+                    cell, icon = make_cell(name)
+                    place_cell(cell, first_row, 0)
+                    self.request_icons(
+                        [(name, lambda photo, w=icon: self._apply_icon(w, photo))],
+                        ICON_SIZE,
+                    )
+                cell = cell_widgets[name]
+                cell.update_idletasks()
+                row_height = cell.winfo_reqheight() + 12
+            for row in range(max(row_cursor, sized_rows)):
+                minsize = row_height if row in cell_rows else 0
+                scroll_frame.grid_rowconfigure(row, minsize=minsize)
+            sized_rows = row_cursor
+
+            populate_visible()
             self._restore_picker_scroll(canvas)
 
-        search_var.trace_add("write", lambda *_a: rebuild_grid())
+        search_after_id: str | None = None
+
+        def schedule_rebuild(*_args: object) -> None:
+            nonlocal search_after_id
+            if search_after_id is not None:
+                picker.after_cancel(search_after_id)
+            search_after_id = picker.after(SEARCH_DEBOUNCE_MS, run_rebuild)
+
+        def run_rebuild() -> None:
+            nonlocal search_after_id
+            search_after_id = None
+            if picker.winfo_exists():
+                rebuild_grid()
+
+        search_var.trace_add("write", schedule_rebuild)
         rebuild_grid()
         picker.after(300, self._enable_picker_scroll_capture)
 
@@ -764,6 +1363,10 @@ class StratagemApp:
         self.key_delay_var.set(value)
         self.persist_user_data()
 
+    def on_batch_input_change(self) -> None:
+        self.batch_input = bool(self.batch_input_var.get())
+        self.persist_user_data()
+
     def on_input_keys_change(self, _event: tk.Event) -> None:
         label = self.input_keys_var.get().strip().lower()
         self.input_keys = "arrows" if "arrow" in label else "wasd"
@@ -821,7 +1424,7 @@ class StratagemApp:
         self.persist_user_data()
 
     def register_hotkeys(self) -> None:
-        if os.name != "nt":
+        if not IS_WIN:
             self.status_var.set("Hotkeys are supported only on Windows.")
             return
         try:
@@ -830,19 +1433,10 @@ class StratagemApp:
             self.status_var.set(str(exc))
             return
 
-        hotkey_map: dict[int, int] = {}
-        for idx, keybind in enumerate(self.keybinds):
-            vk = parse_key_code(keybind["key_code"])
-            hotkey_id = 1000 + idx
-            self.hotkey_id_to_index[hotkey_id] = idx
-            hotkey_map[hotkey_id] = vk
-
-        self.hotkeys.start(hotkey_map)
+        self.hotkeys.start({hotkey_id: vk for hotkey_id, vk, _idx in self._hotkey_table})
         if self.hotkeys.errors:
             self.status_var.set(self.hotkeys.errors[0])
 
-        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
-
     def register_local_bindings(self) -> None:
         for keysym, index in LOCAL_KEYSYM_TO_INDEX.items():
             self.root.bind(
@@ -862,96 +1456,197 @@ class StratagemApp:
         index = self.hotkey_id_to_index.get(hotkey_id)
         if index is None:
             return
-        self.run_in_ui(lambda: self.activate_stratagem(index))
+        # Non-threaded Tcl must not be called from this thread.
+        if self._tcl_threaded:
+            self.root.after(0, self.activate_stratagem, index)
+        else:
+            self.run_in_ui(lambda: self.activate_stratagem(index))
 
     def run_in_ui(self, func: Callable[[], None]) -> None:
-        self.ui_queue.put(func)
+        self.ui_queue.append(func)
+        self._wake_ui()
+
+    def run_in_ui_coalesced(self, tag: str, func: Callable[[], None]) -> None:
+        self._pending_ui[tag] = func
+        self._wake_ui()
+
+    def _wake_ui(self) -> None:
+        if self._drain_armed:
+            return
+        off_thread = threading.current_thread() is not threading.main_thread()
+        if off_thread and not self._tcl_threaded:
+            return
+        self._drain_armed = True
+        try:
+            self.root.event_generate("<<UIQueue>>", when="tail")
+        except (RuntimeError, tk.TclError):
+            self._drain_armed = False
+
+    def _poll_ui_queue(self) -> None:
+        if not self._alive:
+            return
+        self.process_ui_queue()
+        self.root.after(UI_POLL_FALLBACK_MS, self._poll_ui_queue)
 
     def process_ui_queue(self) -> None:
-        while True:
+        # Disarm first so anything queued during the drain raises a new event.
+        self._drain_armed = False
+        pending = len(self.ui_queue)
+        if not pending and not self._pending_ui:
+            return
+        alive = self._alive
+        error: Exception | None = None
+        for _ in range(pending):
+            func = self.ui_queue.popleft()
+            if not alive:
+                continue
             try:
-                func = self.ui_queue.get_nowait()
-            except queue.Empty:
-                break
+                func()
+            except Exception as exc:
+                error = exc
+        while self._pending_ui:
+            _tag, func = self._pending_ui.popitem()
+            if not alive:
+                continue
             try:
-                if self.root.winfo_exists():
-                    func()
+                func()
             except Exception as exc:
-                self.status_var.set(f"UI update error: {exc}")
-        if self.root.winfo_exists():
-            self.root.after(30, self.process_ui_queue)
+                error = exc
+        if error is not None:
+            self.status_var.set(f"UI update error: {error}")
 
     def activate_stratagem(self, index: int) -> None:
         name = self.equipped[index]
         strat = self.stratagem_map.get(name)
         if not strat:
-            self.status_var.set(f"Unknown stratagem: {name}")
+            self.set_status(f"Unknown stratagem: {name}")
+            return
+        self.set_status(f"Activated: {name} ({strat.joined_sequence})")
+        vks = self.vks_for(strat)
+        if self.batch_input:
+            target = self.send_sequence_fast
+        else:
+            target = self.send_sequence
+        self._send_queue.put((target, vks))
+
+    def _send_worker(self) -> None:
+        if IS_WIN:
+            # time.sleep follows the ~15.6 ms tick; this timer is sub-millisecond.
+            self._send_timer = _kernel32.CreateWaitableTimerExW(
+                None,
+                None,
+                CREATE_WAITABLE_TIMER_HIGH_RESOLUTION | CREATE_WAITABLE_TIMER_MANUAL_RESET,
+                TIMER_ALL_ACCESS,
+            )
+        while True:
+            target, vks = self._send_queue.get()
+            try:
+                target(vks)
+            except Exception as exc:
+                self.set_status(f"Input error: {exc}")
+
+    def set_status(self, text: str) -> None:
+        self.run_in_ui_coalesced("status", lambda: self.status_var.set(text))
+
+    def vks_for(self, strat: Stratagem) -> tuple[int, ...]:
+        return strat.vks.get(self.input_keys) or strat.vks["wasd"]
+
+    def send_sequence(self, vks: Sequence[int]) -> None:
+        if not IS_WIN or not vks:
             return
-        sequence_text = " ".join(strat.sequence)
-        self.status_var.set(f"Activated: {name} ({sequence_text})")
-        threading.Thread(
-            target=self.send_sequence, args=(strat.sequence,), daemon=True
-        ).start()
-
-    def send_sequence(self, sequence: list[str]) -> None:
-        if os.name != "nt":
+
+        timer = self._send_timer
+        now = time.perf_counter_ns
+        send_input = _user32.SendInput
+        set_timer = _kernel32.SetWaitableTimer
+        wait_for = _kernel32.WaitForSingleObject
+        due = ctypes.c_longlong()
+        due_ref = ctypes.byref(due)
+
+        def wait_until(deadline_ns: int) -> None:
+            # Sleep on the timer until the last millisecond, then spin.
+            remaining = deadline_ns - now() - SPIN_WAIT_NS
+            if remaining > 0:
+                due.value = -(remaining // 100)
+                if timer and set_timer(timer, due_ref, 0, None, None, False):
+                    wait_for(timer, INFINITE)
+                else:
+                    time.sleep(remaining / 1_000_000_000)
+            while now() < deadline_ns:
+                pass
+
+        thread = _kernel32.GetCurrentThread()
+        prev_priority = _kernel32.GetThreadPriority(thread)
+        _kernel32.SetThreadPriority(thread, THREAD_PRIORITY_TIME_CRITICAL)
+        size = ctypes.sizeof(_INPUT)
+        events = (_INPUT * 3)()
+        for event in events:
+            event.type = 1
+        ctrl_down, key, ctrl_up = (event.union.ki for event in events)
+        ctrl_down.wScan = ctrl_up.wScan = _CTRL_SCAN
+        ctrl_down.dwFlags = KEYEVENTF_SCANCODE
+        ctrl_up.dwFlags = KEYEVENTF_SCANCODE | KEYEVENTF_KEYUP
+        events_ptr = ctypes.cast(events, _LP_INPUT)
+        key_ptr = ctypes.cast(ctypes.addressof(events) + size, _LP_INPUT)
+        ctrl_up_ptr = ctypes.cast(ctypes.addressof(events) + 2 * size, _LP_INPUT)
+        try:
+            step_ns = KEY_HOLD_NS + self.key_delay_ms * 1_000_000
+            send_input(1, events_ptr, size)
+            down_at = now() + KEY_HOLD_NS
+            for vk in vks:
+                key.wVk = vk
+                key.dwFlags = 0
+                wait_until(down_at)
+                send_input(1, key_ptr, size)
+                wait_until(down_at + KEY_HOLD_NS)
+                key.dwFlags = KEYEVENTF_KEYUP
+                send_input(1, key_ptr, size)
+                down_at += step_ns
+            # Ctrl is released one key delay after the last key-up.
+            wait_until(down_at)
+            send_input(1, ctrl_up_ptr, size)
+        finally:
+            _kernel32.SetThreadPriority(thread, prev_priority)
+
+    def send_sequence_fast(self, vks: Sequence[int]) -> None:
+        if not IS_WIN or not vks:
             return
 
-        user32 = ctypes.windll.user32
-        KEYEVENTF_SCANCODE = 0x0008
-        KEYEVENTF_KEYUP = 0x0002
-        VK_CONTROL = 0x11
-        VK_UP = 0x26
-        VK_LEFT = 0x25
-        VK_DOWN = 0x28
-        VK_RIGHT = 0x27
-
-        user32.SendInput.argtypes = [ctypes.c_uint, ctypes.POINTER(_INPUT), ctypes.c_int]
-        user32.SendInput.restype = ctypes.c_uint
-
-        def send_key(vk: int, flags: int) -> None:
-            inp = _INPUT(1, _INPUTUNION(ki=_KEYBDINPUT(vk, 0, flags, 0, None)))
-            user32.SendInput(1, ctypes.byref(inp), ctypes.sizeof(_INPUT))
-
-        def send_ctrl(flags: int) -> None:
-            scan = user32.MapVirtualKeyW(VK_CONTROL, 0)
-            inp = _INPUT(
-                1,
-                _INPUTUNION(ki=_KEYBDINPUT(0, scan, flags | KEYEVENTF_SCANCODE, 0, None)),
-            )
-            user32.SendInput(1, ctypes.byref(inp), ctypes.sizeof(_INPUT))
-
-        send_ctrl(0)
-        time.sleep(0.02)
-        arrow_vk = {"W": VK_UP, "A": VK_LEFT, "S": VK_DOWN, "D": VK_RIGHT}
-
-        for entry in sequence:
-            key_name = entry.upper()
-            if self.input_keys == "arrows":
-                vk = arrow_vk.get(key_name)
-            else:
-                vk = KEY_VK.get(key_name)
-            if not vk:
-                continue
-            send_key(vk, 0)
-            time.sleep(0.02)
-            send_key(vk, KEYEVENTF_KEYUP)
-            time.sleep(self.key_delay_ms / 1000.0)
-        send_ctrl(KEYEVENTF_KEYUP)
+        events = (_INPUT * (2 * len(vks) + 2))()
+        for event in events:
+            event.type = 1
+        events[0].union.ki.wScan = _CTRL_SCAN
+        events[0].union.ki.dwFlags = KEYEVENTF_SCANCODE
+        for i, vk in enumerate(vks):
+            events[1 + 2 * i].union.ki.wVk = vk
+            events[2 + 2 * i].union.ki.wVk = vk
+            events[2 + 2 * i].union.ki.dwFlags = KEYEVENTF_KEYUP
+        events[-1].union.ki.wScan = _CTRL_SCAN
+        events[-1].union.ki.dwFlags = KEYEVENTF_SCANCODE | KEYEVENTF_KEYUP
+        _user32.SendInput(len(events), events, ctypes.sizeof(_INPUT))
 
     def on_close(self) -> None:
-        if self.hotkeys:
-            self.hotkeys.stop()
-        self.root.destroy()
+        self._alive = False
+        try:
+            self._flush_user_data()
+        except OSError as exc:
+            messagebox.showerror(
+                "Save Failed", f"Could not save settings:\n{exc}", parent=self.root
+            )
+        finally:
+            self.render_pool.shutdown(wait=False, cancel_futures=True)
+            if self.hotkeys:
+                self.hotkeys.stop()
+            self.root.destroy()
 
 
-def main() -> None:
-    root = tk.Tk()
-    style = ttk.Style()
-    try:
-        style.theme_use("clam")
-    except tk.TclError:
-        pass
+def configure_styles(root: tk.Tk) -> None:
+    style = ttk.Style(root)
+    if style.theme_use() != "clam":
+        try:
+            style.theme_use("clam")
+        except tk.TclError:
+            pass
     style.configure(
         "Strat.Vertical.TScrollbar",
         troughcolor=DARK_BG,
@@ -967,6 +1662,11 @@ def main() -> None:
         "Strat.Vertical.TScrollbar",
         background=[("active", SCROLLBAR_ACTIVE_BG), ("pressed", SCROLLBAR_ACTIVE_BG)],
     )
+
+
+def main() -> None:
+    root = tk.Tk()
+    configure_styles(root)
     app = StratagemApp(root)
     root.mainloop()
 